@@ -1,25 +1,72 @@
 import os
 import json
+import mmap
 import re
+import stat
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
 import databutton as db
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from dataclasses import dataclass, field, is_dataclass
+from fastapi import APIRouter, HTTPException, Response
 from typing import Dict, List, Optional, Any
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
 router = APIRouter()
 
-class CodebaseStats(BaseModel):
+# Storage key of the latest codebase snapshot
+SNAPSHOT_KEY = "codebase-snapshot-latest"
+
+# App directories scanned for each category, relative to the project root
+CATEGORY_PATHS = {
+    "Pages": "ui/src/pages",
+    "UI Components": "ui/src/components",
+    "UI Files": "ui/src/utils",
+    "APIs": "src/app/apis"
+}
+
+# Skip directories that are likely to cause performance issues
+EXCLUDED_DIRS = frozenset(['.git', 'node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build', '.next', '.idea'])
+
+# Fingerprint of the tree and encoded response of the last scan, reused while nothing changes
+_last_scan = None
+
+# Number of threads used to list directories while scanning
+SCAN_WORKERS = 8
+
+# Number of threads used to read source files for import extraction
+READ_WORKERS = 8
+
+# How many levels deep each category directory is scanned. The change fingerprint uses
+# the same depth, so a cached scan is only reused when everything it covers is unchanged.
+MAX_SCAN_DEPTH = 5
+
+# Limit the number of items scanned per directory to prevent excessive processing
+MAX_DIR_ITEMS = 100
+
+# Source files at least this large are memory-mapped rather than read into memory
+MMAP_MIN_SIZE = 64 * 1024
+
+@dataclass(slots=True)
+class CodebaseStats:
     total_files: int
     total_directories: int
     total_size_bytes: int
     file_types: Dict[str, int]
 
-class ImportInfo(BaseModel):
+@dataclass(slots=True)
+class ImportInfo:
     path: str
     type: str
 
-class FileNode(BaseModel):
+@dataclass(slots=True)
+class FileNode:
     name: str
     path: str
     type: str  # 'file' or 'directory'
@@ -29,144 +76,408 @@ class FileNode(BaseModel):
     imports: Optional[List[ImportInfo]] = None  # List of import info objects
     language: Optional[str] = None  # Programming language
 
-class CodebaseLink(BaseModel):
+@dataclass(slots=True)
+class CodebaseLink:
     source: str  # Source file path
     target: str  # Target file path (imported file)
     type: str    # Type of import
 
-class CodebaseResponse(BaseModel):
+@dataclass(slots=True)
+class CodebaseResponse:
     structure: FileNode
     stats: CodebaseStats
-    links: List[CodebaseLink] = []
+    links: List[CodebaseLink] = field(default_factory=list)
+
+def _json_default(obj):
+    """Serialize models by their fields so nested models are encoded without an asdict() copy"""
+    if is_dataclass(obj):
+        return {name: getattr(obj, name) for name in obj.__slots__}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dump_json(obj):
+    """Encode an object, including nested models, as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, default=_json_default).encode('utf-8')
+
+# Programming language for each file extension
+_LANGUAGE_MAP = {
+    'py': 'Python',
+    'js': 'JavaScript',
+    'jsx': 'JavaScript (React)',
+    'ts': 'TypeScript',
+    'tsx': 'TypeScript (React)',
+    'html': 'HTML',
+    'css': 'CSS',
+    'json': 'JSON',
+    'md': 'Markdown',
+    'yml': 'YAML',
+    'yaml': 'YAML',
+    'txt': 'Text',
+}
 
 # Function to get file extension
+@lru_cache(maxsize=4096)
 def get_file_extension(file_path):
-    _, ext = os.path.splitext(file_path)
-    return ext.lower()[1:] if ext else ""  # Remove the dot
+    dot = file_path.rfind('.')
+    slash = file_path.rfind('/')
+    # Like os.path.splitext, leading dots of the file name don't start an extension
+    if dot > slash + 1 and file_path[slash + 1:dot].lstrip('.'):
+        return file_path[dot + 1:].lower()  # Remove the dot
+    return ""
 
 # Function to get programming language based on extension
+@lru_cache(maxsize=4096)
 def get_language(file_path):
     ext = get_file_extension(file_path)
-    language_map = {
-        'py': 'Python',
-        'js': 'JavaScript',
-        'jsx': 'JavaScript (React)',
-        'ts': 'TypeScript',
-        'tsx': 'TypeScript (React)',
-        'html': 'HTML',
-        'css': 'CSS',
-        'json': 'JSON',
-        'md': 'Markdown',
-        'yml': 'YAML',
-        'yaml': 'YAML',
-        'txt': 'Text',
-    }
-    return language_map.get(ext, ext.upper() if ext else 'Unknown')
-
-# Function to extract imports from a file with better metadata
-def extract_imports(file_path, content, root_path="/app"):
-    imports = []
-    ext = get_file_extension(file_path)
-    
-    if ext in ['js', 'jsx', 'ts', 'tsx']:
-        # JavaScript/TypeScript import regex patterns
-        import_patterns = [
-            # import X from 'Y'
-            (r'import\s+.*?\s+from\s+[\'"](.*?)[\'"](;)?', 'module'),
-            # import 'Y'
-            (r'import\s+[\'"](.*?)[\'"](;)?', 'direct'),
-            # require('Y')
-            (r'require\s*?\(\s*[\'"](.*?)[\'"](;)?\)', 'require'),
-        ]
+    return _LANGUAGE_MAP.get(ext, ext.upper() if ext else 'Unknown')
+
+# JavaScript/TypeScript import regexes, compiled once at module import. Both import forms are
+# alternatives of a single pattern so a file is scanned in one pass; the name of the group
+# that matched is the import type. Both alternatives start with the literal import, so the
+# engine can jump straight from one occurrence of it to the next. require() has its own
+# pattern, which keeps that literal prefix intact and only runs on files using require.
+# Patterns are bytes so they run directly over the raw file contents without decoding
+# them first.
+_JS_IMPORT_PATTERN = re.compile(
+    # import X from 'Y'
+    rb'import\s+.*?\s+from\s+[\'"](?P<module>.*?)[\'"]'
+    # import 'Y'
+    rb'|import\s+[\'"](?P<direct>.*?)[\'"]'
+)
+_JS_REQUIRE_PATTERN = re.compile(
+    # require('Y')
+    rb'require\s*?\(\s*[\'"](?P<require>.*?)[\'"]\)'
+)
+# A require( call. _has_require_call checks the word boundary before it by hand, because
+# a \b in the pattern would stop the engine from searching for the literal require.
+_JS_REQUIRE_CALL = re.compile(rb'require\s*\(')
+
+# Python import regex patterns. They run on the decoded import prologue, so module names
+# may contain any Unicode word characters.
+_PY_IMPORT_PATTERNS = [
+    # import X
+    (re.compile(r'import\s+([\w\.]+)'), 'module'),
+    # from X import ...
+    (re.compile(r'from\s+([\w\.]+)\s+import'), 'from'),
+]
+
+# Line starts allowed in the import prologue at the top of a file, and the delimiters of
+# comments or docstrings that can span several lines there. Blank and indented lines,
+# such as the members of a multi-line import, are always allowed.
+_JS_PROLOGUE_PREFIXES = (b'import', b'export', b'from', b'}', b'//', b'*', b'"', b"'", b'#!')
+_JS_BLOCK_DELIMITERS = ((b'/*', b'*/'),)
+_PY_PROLOGUE_PREFIXES = (b'import', b'from', b')', b'#', b'"', b"'", b'try', b'except', b'else', b'finally', b'if', b'elif')
+_PY_BLOCK_DELIMITERS = ((b'"""', b'"""'), (b"'''", b"'''"))
+# Letters that can come before the quotes of a Python string, as in r"""...""" or u'...'
+_PY_STRING_PREFIXES = b'rRuUbBfF'
+
+def _import_prologue_end(content, allowed_prefixes, block_delimiters, string_prefixes=b''):
+    """Return the offset of the first line after a file's leading imports, comments and blank lines"""
+    # A UTF-8 byte order mark before the first line is skipped
+    pos = 3 if content[:3] == b'\xef\xbb\xbf' else 0
+    size = len(content)
+    while pos < size:
+        line_end = content.find(b'\n', pos)
+        if line_end == -1:
+            line_end = size
+        line = content[pos:line_end]
         
-        for pattern, import_type in import_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                import_path = match[0] if isinstance(match, tuple) else match
-                if import_path:
-                    # Normalize import paths for components, utils, etc.
-                    if import_path.startswith('components/'):
-                        normalized_path = f"/ui/src/{import_path}"
-                        imports.append({'path': normalized_path, 'type': import_type})
-                    elif import_path.startswith('utils/'):
-                        normalized_path = f"/ui/src/{import_path}"
-                        imports.append({'path': normalized_path, 'type': import_type})
-                    elif import_path.startswith('@/'):
-                        # Shadcn imports - these have special path in our system
-                        normalized_path = f"/ui/src/{import_path[2:]}"
-                        imports.append({'path': normalized_path, 'type': import_type})
-                    elif not (import_path.startswith('.') or import_path.startswith('/')):
-                        # Try to resolve absolute imports based on common patterns
-                        if import_path in ['react', 'react-dom', 'react-router-dom', 'app', 'brain']:
-                            imports.append({'path': import_path, 'type': 'external'})
-                        else:
-                            imports.append({'path': import_path, 'type': import_type})
-                    else:
-                        # Relative imports - try to resolve
-                        dirname = os.path.dirname(file_path)
-                        if import_path.startswith('.'):
-                            # Attempt to resolve relative path
-                            source_dir = os.path.dirname(os.path.join(root_path, file_path.lstrip('/')))
-                            if import_path.startswith('./'):
-                                full_path = os.path.normpath(os.path.join(source_dir, import_path[2:]))
-                            elif import_path.startswith('../'):
-                                full_path = os.path.normpath(os.path.join(source_dir, import_path))
-                            else:
-                                full_path = os.path.normpath(os.path.join(dirname, import_path))
-                                
-                            # Convert to relative path from root
-                            if full_path.startswith(root_path):
-                                rel_path = full_path[len(root_path):]
-                                imports.append({'path': rel_path, 'type': import_type})
-                            else:
-                                imports.append({'path': import_path, 'type': import_type})
-                        else:
-                            imports.append({'path': import_path, 'type': import_type})
+        if line.strip() and not line[:1].isspace():
+            # A string's prefix letters, at most two of them, are skipped to reach its quotes
+            start = pos
+            if string_prefixes:
+                unprefixed = line.lstrip(string_prefixes)
+                if unprefixed[:1] in (b'"', b"'") and len(line) - len(unprefixed) <= 2:
+                    start += len(line) - len(unprefixed)
+                    line = unprefixed
+            
+            block = next(((opener, closer) for opener, closer in block_delimiters if line.startswith(opener)), None)
+            if block:
+                # Skip to the end of a comment or docstring, which may be on a later line
+                opener, closer = block
+                close = content.find(closer, start + len(opener))
+                if close == -1:
+                    return size
+                line_end = content.find(b'\n', close + len(closer))
+                if line_end == -1:
+                    return size
+            elif not line.startswith(allowed_prefixes):
+                return pos
+        
+        pos = line_end + 1
     
+    return size
+
+def _has_require_call(content):
+    """Whether JS/TS source calls require(, as opposed to only using words like required or isRequired"""
+    if content.find(b'require') == -1:
+        return False
+    for match in _JS_REQUIRE_CALL.finditer(content):
+        start = match.start()
+        previous = content[start - 1:start]
+        if not (previous.isalnum() or previous == b'_'):
+            return True
+    return False
+
+# brain client calls searched for in frontend files, mapped to the API they connect to
+_BRAIN_API_TARGETS = {
+    b'brain.scan_codebase': "src/app/apis/codebase",
+    b'brain.get_codebase_history': "src/app/apis/codebase",
+}
+
+# All brain client calls as one alternation, so a file is searched for every call in a single pass
+_BRAIN_CALL_PATTERN = re.compile(b'|'.join(re.escape(call) for call in _BRAIN_API_TARGETS))
+
+# Bare JS/TS module names that are treated as external dependencies
+_JS_EXTERNAL_MODULES = frozenset(['react', 'react-dom', 'react-router-dom', 'app', 'brain'])
+
+def _resolve_relative(source_dir_parts, rel_path):
+    """Resolve a relative path against a directory given as path segments, like os.path.normpath"""
+    parts = list(source_dir_parts)
+    for segment in rel_path.split('/'):
+        if segment == '..':
+            if parts:
+                parts.pop()
+        elif segment and segment != '.':
+            parts.append(segment)
+    return '/' + '/'.join(parts)
+
+def _classify_js_import(import_path, import_type, source_dir_parts, root_path):
+    """Normalize a JS/TS import path, returning its (path, type)"""
+    # Normalize import paths for components, utils, etc.
+    if import_path.startswith(('components/', 'utils/')):
+        return f"/ui/src/{import_path}", import_type
+    if import_path.startswith('@/'):
+        # Shadcn imports - these have special path in our system
+        return f"/ui/src/{import_path[2:]}", import_type
+    if not import_path.startswith(('.', '/')):
+        # Try to resolve absolute imports based on common patterns
+        if import_path in _JS_EXTERNAL_MODULES:
+            return import_path, 'external'
+        return import_path, import_type
+    if not import_path.startswith(('./', '../')):
+        # Absolute paths and bare dot paths like '..' are kept as written
+        return import_path, import_type
+    
+    # Relative imports - attempt to resolve relative path
+    full_path = _resolve_relative(source_dir_parts, import_path)
+    
+    # Convert to relative path from root
+    if full_path.startswith(root_path):
+        return full_path[len(root_path):], import_type
+    return import_path, import_type
+
+# Function to extract imports from a file with better metadata.
+# content is the raw file bytes, or an mmap of them. Returns the imports together with
+# flags noted while extracting them, e.g. flags['has_brain'] when the brain client is imported.
+def extract_imports(file_path, content, root_path="/app", ext=None):
+    if ext is None:
+        ext = get_file_extension(file_path)
+    
+    flags = {}
+    if ext in ['js', 'jsx', 'ts', 'tsx']:
+        return _extract_js_imports(file_path, content, root_path, flags), flags
     elif ext == 'py':
-        # Python import regex patterns
-        import_patterns = [
-            # import X
-            (r'import\s+([\w\.]+)', 'module'),
-            # from X import ...
-            (r'from\s+([\w\.]+)\s+import', 'from'),
-        ]
-        
-        for pattern, import_type in import_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                if match:
-                    # Handle Python module paths
-                    if match == 'app' or match.startswith('app.'):
-                        module_path = match[4:] if match.startswith('app.') else ''
-                        if module_path.startswith('apis.'):
-                            # This is importing from another API
-                            api_name = module_path[5:]
-                            imports.append({'path': f"/src/app/apis/{api_name}", 'type': import_type})
-                        else:
-                            imports.append({'path': match, 'type': 'internal'})
-                    elif match in ['databutton', 'fastapi', 'pydantic']:
-                        imports.append({'path': match, 'type': 'external'})
+        return _extract_py_imports(content), flags
+    return [], flags
+
+def _extract_js_imports(file_path, content, root_path, flags):
+    """Extract imports from JavaScript/TypeScript source"""
+    imports = []
+    # Substring checks run in C; files without any import keyword skip the regex entirely
+    if content.find(b'import') == -1 and content.find(b'require') == -1:
+        return imports
+    
+    # Imports sit at the top of the file, so only that prologue needs scanning.
+    # require() calls can appear anywhere, so files using it are scanned in full.
+    has_require = _has_require_call(content)
+    if not has_require:
+        content = content[:_import_prologue_end(content, _JS_PROLOGUE_PREFIXES, _JS_BLOCK_DELIMITERS)]
+    
+    # Directory of the importing file as path segments, used to resolve relative imports
+    source_dir_parts = [part for part in f"{root_path}/{file_path}".split('/') if part][:-1]
+    
+    matches = list(_JS_IMPORT_PATTERN.finditer(content))
+    if has_require:
+        matches.extend(_JS_REQUIRE_PATTERN.finditer(content))
+        # Merge both kinds of match back into file order
+        matches.sort(key=lambda match: match.start())
+    
+    for match in matches:
+        import_type = match.lastgroup
+        import_path = match.group(import_type).decode('utf-8', 'replace')
+        if import_path:
+            path, import_type = _classify_js_import(import_path, import_type, source_dir_parts, root_path)
+            imports.append(ImportInfo(path=path, type=import_type))
+            if path == 'brain' and import_type == 'external':
+                flags['has_brain'] = True
+    
+    return imports
+
+def _extract_py_imports(content):
+    """Extract imports from Python source"""
+    imports = []
+    if content.find(b'import') == -1:
+        return imports
+    
+    # Only scan the module's leading imports, up to the first def, class or other statement.
+    # That slice is small, so it is decoded for the str patterns.
+    prologue_end = _import_prologue_end(content, _PY_PROLOGUE_PREFIXES, _PY_BLOCK_DELIMITERS, _PY_STRING_PREFIXES)
+    content = content[:prologue_end].decode('utf-8', 'replace')
+    
+    for pattern, import_type in _PY_IMPORT_PATTERNS:
+        for match in pattern.findall(content):
+            if match:
+                # Handle Python module paths
+                if match == 'app' or match.startswith('app.'):
+                    module_path = match[4:] if match.startswith('app.') else ''
+                    if module_path.startswith('apis.'):
+                        # This is importing from another API
+                        api_name = module_path[5:]
+                        imports.append(ImportInfo(path=f"/src/app/apis/{api_name}", type=import_type))
                     else:
-                        imports.append({'path': match, 'type': import_type})
+                        imports.append(ImportInfo(path=match, type='internal'))
+                elif match in ['databutton', 'fastapi', 'pydantic']:
+                    imports.append(ImportInfo(path=match, type='external'))
+                else:
+                    imports.append(ImportInfo(path=match, type=import_type))
     
     return imports
 
-def scan_directory(base_path, current_path="", max_depth=5, all_files_map=None):
-    """Recursively scan a directory and build a file tree structure"""
-    if max_depth <= 0:
-        return None
+class _ScanState:
+    """Files, stats and links accumulated in a single pass while directories are scanned"""
     
-    if all_files_map is None:
-        all_files_map = {}
+    def __init__(self):
+        self.files = {}  # Map of file path to file node
+        self.file_types = Counter()
+        self.total_size_bytes = 0
+        self.total_directories = 0
+        self.links = []
     
-    full_path = os.path.join(base_path, current_path)
-    if not os.path.exists(full_path):
-        return None
+    def add_file(self, file_node, ext):
+        self.files[file_node.path] = file_node
+        self.file_types[ext or "no_extension"] += 1
+        self.total_size_bytes += file_node.size
+
+def scan_directories(base_path, paths, max_depth=MAX_SCAN_DEPTH, state=None):
+    """Scan several directories together, returning a map of each path to its file tree.
+    
+    All trees share one work queue, so independent directories are listed concurrently
+    and the scan takes about as long as the largest tree rather than the sum of them.
+    Files, stats and import links are recorded on state as the trees are built.
+    """
+    if state is None:
+        state = _ScanState()
+    
+    trees = {}
+    roots = []
+    # Every directory below a root, in the order it was created, so sizes can be
+    # rolled up children-first afterwards
+    directories = []
+    # Source files whose imports still need to be extracted, read in one batch at the end
+    pending_reads = []
+    
+    # Directory listings run on a thread pool so several scandir calls are in flight
+    # at once, while this thread consumes the results and builds the trees
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        pending = {}
+        for current_path in paths:
+            trees[current_path] = None
+            if max_depth <= 0:
+                continue
+            
+            full_path = os.path.join(base_path, current_path)
+            try:
+                root_stat = os.stat(full_path)
+            except OSError:
+                continue
+            
+            name = os.path.basename(current_path) or os.path.basename(base_path)
+            
+            if not stat.S_ISDIR(root_stat.st_mode):
+                trees[current_path] = _build_file_node(name, full_path, current_path, root_stat, state, pending_reads)
+                continue
+            
+            root = FileNode(
+                name=name,
+                path=current_path or "/",
+                type="directory",
+                size=0,
+                children=[],
+                last_modified=root_stat.st_mtime
+            )
+            trees[current_path] = root
+            
+            # Children one level down are only included while there is depth left
+            if name not in EXCLUDED_DIRS and max_depth > 1:
+                roots.append(root)
+                pending[executor.submit(_list_directory, full_path)] = (root, current_path, max_depth)
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                node, rel_path, depth = pending.pop(future)
+                for entry_name, entry_path, is_dir, entry_stat in future.result():
+                    item_path = f"{rel_path}/{entry_name}" if rel_path else entry_name
+                    
+                    if is_dir:
+                        child_node = FileNode(
+                            name=entry_name,
+                            path=item_path,
+                            type="directory",
+                            size=0,
+                            children=[],
+                            # Excluded directories are placeholders listed without a stat
+                            last_modified=entry_stat.st_mtime if entry_stat else None
+                        )
+                        directories.append(child_node)
+                        if entry_stat and depth - 1 > 1:
+                            pending[executor.submit(_list_directory, entry_path)] = (child_node, item_path, depth - 1)
+                    else:
+                        child_node = _build_file_node(entry_name, entry_path, item_path, entry_stat, state, pending_reads)
+                    
+                    node.children.append(child_node)
+    
+    # Children are always created after their parent, so walking the list backwards
+    # rolls directory sizes up from the leaves
+    for directory in reversed(directories):
+        directory.size = sum(child.size for child in directory.children)
+    for root in roots:
+        root.size = sum(child.size for child in root.children)
+    state.total_directories += len(directories)
     
-    # Get the actual name - handle special cases for API directories
-    name = os.path.basename(current_path) or os.path.basename(base_path)
+    _load_imports(pending_reads, base_path, state)
+    
+    return trees
+
+def _list_directory(dir_path):
+    """List a directory, returning (name, full path, is_dir, stat) for each entry.
+    
+    Symlinks are followed for both the type and the stat, so the two always agree.
+    Excluded directories are never descended into, so they are listed without a stat.
+    """
+    listing = []
+    try:
+        with os.scandir(dir_path) as it:
+            # Entries are streamed, so reading stops at the limit without listing the whole directory
+            for entry in islice(it, MAX_DIR_ITEMS):
+                try:
+                    if entry.name in EXCLUDED_DIRS:
+                        listing.append((entry.name, entry.path, True, None))
+                        continue
+                    listing.append((entry.name, entry.path, entry.is_dir(), entry.stat()))
+                except OSError:
+                    # Skip entries we can't access
+                    continue
+    except OSError:
+        # Skip directories we can't access
+        pass
     
+    return listing
+
+def _build_file_node(name, full_path, current_path, file_stat, state, pending_reads):
+    """Build a file node from an already-fetched stat result"""
     # Special handling for API directories: If this is an API directory with __init__.py,
     # use the directory name as the name instead of the file
     if name == '__init__.py' and '/apis/' in current_path:
@@ -174,129 +485,141 @@ def scan_directory(base_path, current_path="", max_depth=5, all_files_map=None):
         api_dir = os.path.dirname(current_path)
         name = os.path.basename(api_dir) + '.py'  # Append .py to clearly show it's a Python file
     
-    # Skip directories that are likely to cause performance issues
-    excluded_dirs = ['.git', 'node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build', '.next', '.idea']
-    if name in excluded_dirs:
-        return FileNode(
-            name=name,
-            path=current_path or "/",
-            type="directory",
-            size=0,
-            children=[],
-            last_modified=os.path.getmtime(full_path) if os.path.exists(full_path) else None
-        )
+    file_node = FileNode(
+        name=name,
+        path=current_path,
+        type="file",
+        size=file_stat.st_size,
+        last_modified=file_stat.st_mtime,
+        imports=[],
+        language=get_language(current_path)
+    )
     
-    # For directories
-    if os.path.isdir(full_path):
-        children = []
-        total_size = 0
-        
-        try:
-            items = os.listdir(full_path)
-            # Limit the number of items to scan to prevent excessive processing
-            max_items = 100
-            if len(items) > max_items:
-                items = items[:max_items]
-                
-            for item in items:
-                item_path = os.path.join(current_path, item)
-                child_node = scan_directory(base_path, item_path, max_depth - 1, all_files_map)
-                if child_node:
-                    children.append(child_node)
-                    if child_node.size:
-                        total_size += child_node.size
-                        
-                    # Add file node to map for quick lookup
-                    if child_node.type == "file":
-                        all_files_map[child_node.path] = child_node
-        except PermissionError:
-            # Skip directories we can't access
-            pass
-        
-        return FileNode(
-            name=name,
-            path=current_path or "/",
-            type="directory",
-            size=total_size,
-            children=children,
-            last_modified=os.path.getmtime(full_path) if os.path.exists(full_path) else None
-        )
+    # Queue file contents for import extraction (if appropriate file type)
+    ext = get_file_extension(current_path)
+    if ext in ['js', 'jsx', 'ts', 'tsx', 'py']:
+        pending_reads.append((file_node, full_path, ext))
     
-    # For files
-    else:
-        try:
-            size = os.path.getsize(full_path)
-            last_modified = os.path.getmtime(full_path)
-            file_language = get_language(full_path)
-            
-            # Read file contents for import extraction (if appropriate file type)
-            imports = []
-            if get_file_extension(full_path) in ['js', 'jsx', 'ts', 'tsx', 'py']:
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        imports = extract_imports(current_path, content, base_path)
-                except Exception as e:
-                    # Skip files we can't read
-                    print(f"Error reading {full_path}: {str(e)}")
-                    pass
-            
-            file_node = FileNode(
-                name=name,
-                path=current_path,
-                type="file",
-                size=size,
-                last_modified=last_modified,
-                imports=imports,
-                language=file_language
-            )
-            
-            # Add file to map for quick lookup
-            all_files_map[current_path] = file_node
-            
-            return file_node
-        except (PermissionError, FileNotFoundError):
-            # Skip files we can't access
-            return None
-
-def calculate_stats(structure):
-    """Calculate statistics from the file structure"""
-    stats = {
-        "total_files": 0,
-        "total_directories": 0,
-        "total_size_bytes": 0,
-        "file_types": {}
-    }
+    # Add file to map for quick lookup and count it towards the stats
+    state.add_file(file_node, ext)
+    
+    return file_node
+
+def _scan_source(file_path, content, ext, base_path):
+    """Return a source file's imports and the API files its brain client calls connect to"""
+    imports, flags = extract_imports(file_path, content, base_path, ext)
+    
+    # Search files that import the brain client for brain.X method calls
+    api_targets = []
+    if flags.get('has_brain', False):
+        calls = set(_BRAIN_CALL_PATTERN.findall(content))
+        api_targets = [target for call, target in _BRAIN_API_TARGETS.items() if call in calls]
     
-    def traverse(node):
-        if node.type == "directory":
-            stats["total_directories"] += 1
-            if node.children:
-                for child in node.children:
-                    traverse(child)
-        else:  # file
-            stats["total_files"] += 1
-            stats["total_size_bytes"] += node.size
+    return imports, api_targets
+
+def _read_source(full_path, file_path, size, ext, base_path):
+    """Scan a source file straight from its bytes, returning None if it can't be read"""
+    try:
+        with open(full_path, 'rb') as f:
+            # Large files are memory-mapped and scanned in place instead of being copied
+            if size >= MMAP_MIN_SIZE:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    return _scan_source(file_path, content, ext, base_path)
+            return _scan_source(file_path, f.read(), ext, base_path)
+    except Exception as e:
+        # Skip files we can't read
+        print(f"Error reading {full_path}: {str(e)}")
+        return None
+
+def _load_imports(pending_reads, base_path, state):
+    """Read all queued source files concurrently, attach their imports and record their links"""
+    if not pending_reads:
+        return
+    
+    # File reads are I/O bound, so overlapping them hides most of the wait. Each file is
+    # read exactly once; brain client usage is found while its content is at hand.
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        results = executor.map(
+            lambda pending: _read_source(pending[1], pending[0].path, pending[0].size, pending[2], base_path),
+            pending_reads
+        )
+        for (file_node, _, _), result in zip(pending_reads, results):
+            if result is None:
+                continue
             
-            # Get file extension
-            ext = get_file_extension(node.path)
-            if ext:
-                stats["file_types"][ext] = stats["file_types"].get(ext, 0) + 1
-            else:
-                stats["file_types"]["no_extension"] = stats["file_types"].get("no_extension", 0) + 1
+            imports, api_targets = result
+            file_node.imports = imports
+            for import_info in imports:
+                # Skip external dependencies
+                if import_info.type == 'external':
+                    continue
+                
+                # For standard imports in our app structure
+                state.links.append(CodebaseLink(
+                    source=file_node.path,
+                    target=import_info.path,
+                    type=import_info.type
+                ))
+            
+            # Connect pages that use brain.X_method to the corresponding API files
+            for target in api_targets:
+                state.links.append(CodebaseLink(
+                    source=file_node.path,
+                    target=target,
+                    type='api-usage'
+                ))
+
+def _tree_fingerprint(base_path, paths, max_depth=MAX_SCAN_DEPTH):
+    """Collect (path, mtime, size) for everything scan_directories would visit, without reading any files"""
+    fingerprint = []
+    for path in paths:
+        full_path = os.path.join(base_path, path)
+        try:
+            fingerprint.append((full_path, os.stat(full_path).st_mtime_ns))
+        except OSError:
+            fingerprint.append((full_path, None))
+            continue
+        
+        stack = [(full_path, max_depth)]
+        while stack:
+            dir_path, depth = stack.pop()
+            if depth <= 1:
+                continue
+            for _, entry_path, is_dir, entry_stat in _list_directory(dir_path):
+                if entry_stat is None:
+                    # Excluded directories only appear as empty placeholders
+                    fingerprint.append((entry_path, None))
+                    continue
+                fingerprint.append((entry_path, entry_stat.st_mtime_ns, entry_stat.st_size))
+                if is_dir:
+                    stack.append((entry_path, depth - 1))
     
-    traverse(structure)
-    return CodebaseStats(**stats)
+    return tuple(fingerprint)
+
+def calculate_stats(state):
+    """Calculate statistics from the totals accumulated while scanning"""
+    return CodebaseStats(
+        total_files=len(state.files),
+        total_directories=state.total_directories,
+        total_size_bytes=state.total_size_bytes,
+        file_types=dict(state.file_types)
+    )
 
 @router.get("/scan")
 def scan_codebase():
     """Scans the codebase structure and returns a tree representation focusing on key app areas with file relationships"""
+    global _last_scan
     try:
         # Use the current directory as the base path
         base_path = "/app"  # Assuming /app is the root of the project
         
-        # Create a map to store all file nodes for quick reference
-        all_files_map = {}
+        # Only stat calls are needed to tell whether anything changed since the last scan
+        fingerprint = _tree_fingerprint(base_path, CATEGORY_PATHS.values(), MAX_SCAN_DEPTH)
+        if _last_scan is not None and _last_scan[0] == fingerprint:
+            return Response(content=_last_scan[1], media_type="application/json")
+        
+        # Collect file nodes, stats and links in the same pass as the scan
+        state = _ScanState()
         
         # Define focused structure with key app areas
         structure = FileNode(
@@ -360,22 +683,18 @@ def scan_codebase():
             )
         }
         
-        # Scan specific directories and build file map
-        category_paths = {
-            "Pages": "ui/src/pages",
-            "UI Components": "ui/src/components",
-            "UI Files": "ui/src/utils",
-            "APIs": "src/app/apis"
+        # Scan specific directories together and build file map
+        category_dirs = {
+            category: path for category, path in CATEGORY_PATHS.items()
+            if os.path.isdir(os.path.join(base_path, path))
         }
-        
-        for category, path in category_paths.items():
-            dir_path = os.path.join(base_path, path)
-            if os.path.exists(dir_path) and os.path.isdir(dir_path):
-                node = scan_directory(base_path, path, all_files_map=all_files_map)
-                if node:
-                    categories[category].children = node.children
-                    categories[category].size = node.size
-                    structure.size += node.size
+        trees = scan_directories(base_path, category_dirs.values(), MAX_SCAN_DEPTH, state)
+        for category, path in category_dirs.items():
+            node = trees[path]
+            if node:
+                categories[category].children = node.children
+                categories[category].size = node.size
+                structure.size += node.size
         
         # Add scanned categories to main structure
         for _, category_node in categories.items():
@@ -391,70 +710,18 @@ def scan_codebase():
                     language="Text"
                 )
                 category_node.children = [simple_node]
+                state.add_file(simple_node, get_file_extension(simple_node.path))
                 structure.children.append(category_node)
         
         if not structure or not structure.children:
             raise HTTPException(status_code=500, detail="Failed to scan codebase structure")
         
-        # Calculate stats
-        stats = calculate_stats(structure)
+        # The root and category nodes are directories too
+        state.total_directories += 1 + len(structure.children)
+        stats = calculate_stats(state)
         
-        # Now build links based on imports
-        links = []
-        for file_path, file_node in all_files_map.items():
-            if file_node.imports:
-                for import_info in file_node.imports:
-                    # ImportInfo objects have direct attributes
-                    target_path = import_info.path
-                    import_type = import_info.type
-                    
-                    # Skip external dependencies
-                    if import_type == 'external':
-                        continue
-                    
-                    # For standard imports in our app structure
-                    link = CodebaseLink(
-                        source=file_path,
-                        target=target_path,
-                        type=import_type
-                    )
-                    links.append(link)
-        
-        # Special handling for brain client API usage
-        # Connect pages that use brain.X_method to the corresponding API files
-        for file_path, file_node in all_files_map.items():
-            # Check if this is a frontend file that might use brain methods
-            if file_path.endswith(('.tsx', '.ts', '.jsx', '.js')) and file_node.imports:
-                # Look for files that import the brain client
-                brain_import = any(imp.path == 'brain' and imp.type == 'external' for imp in file_node.imports)
-                
-                if brain_import:
-                    # Search file content for brain.X method calls
-                    try:
-                        with open(os.path.join(base_path, file_path), 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            
-                            # Look for calls to scan_codebase and get_codebase_history
-                            if 'brain.scan_codebase' in content:
-                                # Connect to codebase API
-                                link = CodebaseLink(
-                                    source=file_path,
-                                    target="src/app/apis/codebase",
-                                    type="api-usage"
-                                )
-                                links.append(link)
-                                
-                            if 'brain.get_codebase_history' in content:
-                                # Connect to codebase API
-                                link = CodebaseLink(
-                                    source=file_path,
-                                    target="src/app/apis/codebase",
-                                    type="api-usage"
-                                )
-                                links.append(link)
-                    except Exception:
-                        # Skip if file can't be read
-                        pass
+        # Import and brain client API usage links were already recorded while scanning
+        links = state.links
         
         # Create response with links
         response = CodebaseResponse(
@@ -463,11 +730,12 @@ def scan_codebase():
             links=links
         )
         
-        # Save a snapshot to storage
-        snapshot_data = response.dict()
-        db.storage.json.put("codebase-snapshot-latest", snapshot_data)
+        # Serialize once and use the same bytes for the snapshot and the response
+        payload = _dump_json(response)
+        db.storage.binary.put(SNAPSHOT_KEY, payload)
+        _last_scan = (fingerprint, payload)
         
-        return response
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scanning codebase: {str(e)}")
 
@@ -475,8 +743,13 @@ def scan_codebase():
 def get_codebase_history():
     """Gets the latest snapshot of the codebase structure"""
     try:
-        # Try to get the latest snapshot
-        snapshot = db.storage.json.get("codebase-snapshot-latest", default=None)
+        # Try to get the latest snapshot; it is stored as encoded JSON, so return it as is
+        payload = db.storage.binary.get(SNAPSHOT_KEY, default=None)
+        if payload:
+            return Response(content=payload, media_type="application/json")
+        
+        # Fall back to snapshots saved as JSON objects by earlier versions
+        snapshot = db.storage.json.get(SNAPSHOT_KEY, default=None)
         if not snapshot:
             return {"message": "No codebase snapshot available. Please scan first."}
         
@@ -0,0 +1,50 @@
+from codebase import _JS_BLOCK_DELIMITERS, _JS_PROLOGUE_PREFIXES, _has_require_call, _import_prologue_end, extract_imports
+
+def import_paths(file_path, source):
+    imports, _ = extract_imports(file_path, source)
+    return [info.path for info in imports]
+
+def test_prologue_ends_at_first_statement():
+    source = b"import a from 'a';\n\nconst x = 1;\nimport b from 'b';\n"
+    assert import_paths("ui/src/pages/App.tsx", source) == ['a']
+
+def test_prologue_keeps_multiline_imports_and_block_comments():
+    source = b"/* header\n * comment */\nimport {\n  A,\n  B\n} from 'a';\nimport b from 'b';\nfoo();\n"
+    assert _import_prologue_end(source, _JS_PROLOGUE_PREFIXES, _JS_BLOCK_DELIMITERS) == source.index(b'foo();')
+
+def test_prologue_skips_utf8_bom():
+    source = b"\xef\xbb\xbfimport a from 'a';\nimport b from 'b';\n"
+    assert _import_prologue_end(source, (b'import',), ()) == len(source)
+    assert import_paths("ui/src/pages/App.tsx", source) == ['a', 'b']
+
+def test_prologue_allows_exports_between_imports():
+    source = b"import a from 'a';\nexport type T = string;\nimport b from 'b';\n"
+    assert import_paths("ui/src/pages/App.tsx", source) == ['a', 'b']
+
+def test_two_imports_on_one_line():
+    source = b"import a from 'a';import b from 'b';\n"
+    assert import_paths("ui/src/pages/App.tsx", source) == ['a', 'b']
+
+def test_require_call_needs_word_boundary():
+    assert _has_require_call(b"const a = require('a');")
+    assert _has_require_call(b"require ('a')")
+    assert not _has_require_call(b"<input required isRequired={true} />")
+    assert not _has_require_call(b"isRequire('a')")
+    assert not _has_require_call(b"import a from 'a';")
+
+def test_require_calls_are_found_after_prologue():
+    source = b"import a from 'a';\nconst x = 1;\nconst b = require('b');\n"
+    assert import_paths("ui/src/pages/App.js", source) == ['a', 'b']
+
+def test_py_prologue_skips_prefixed_docstrings():
+    for prefix in (b'', b'r', b'u', b'R', b'rb'):
+        source = prefix + b'"""Module\ndocstring"""\nimport os\n\ndef f():\n    import json\n'
+        assert import_paths("src/app/apis/x/__init__.py", source) == ['os'], prefix
+
+def test_py_prologue_skips_utf8_bom():
+    source = b"\xef\xbb\xbf# comment\nimport os\n"
+    assert import_paths("src/app/apis/x/__init__.py", source) == ['os']
+
+def test_py_imports_keep_unicode_module_names():
+    source = "import café\nfrom naïve.sub import x\n".encode('utf-8')
+    assert import_paths("src/app/apis/x/__init__.py", source) == ['café', 'x', 'naïve.sub']